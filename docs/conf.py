@@ -14,12 +14,16 @@ try:
     from mock import Mock
 
     to_be_mocked = [
-        "micropython",
         "machine",
     ]
     for module in to_be_mocked:
         sys.modules[module] = Mock()
         print("Mocked '{}' module".format(module))
+    # Code emitter decorators and const() must hand back what they were given,
+    # otherwise the decorated methods and constants turn into Mocks
+    sys.modules["micropython"] = Mock(
+        native=lambda f: f, viper=lambda f: f, const=lambda x: x
+    )
 
     import micropython_motor
 except ImportError:
@@ -25,7 +25,8 @@ drv_switch = Pin(16, Pin.OUT)
 drv_switch.on()
 
 # Stepper motor setup
-DELAY = 0.006  # fastest is ~ 0.004, 0.01 is still very smooth, gets steppy after that
+# Step period in us, fastest is ~ 4000, 10000 is still smooth, gets steppy after that
+DELAY = 6000
 STEPS = 513  # this is a full 360º
 coils = (Pin(21, Pin.OUT), Pin(20, Pin.OUT), Pin(19, Pin.OUT), Pin(18, Pin.OUT))
 
@@ -35,20 +36,28 @@ stepper_motor = stepper.StepperMotor(
 )
 
 
-def stepper_fwd():
-    print("stepper forward")
+def stepper_move(direction):
+    # pylint: disable=no-member
+    # Schedule every step against a deadline, so the time spent in onestep
+    # does not stretch the step period
+    next_step = time.ticks_us()
     for _ in range(STEPS):
-        stepper_motor.onestep(direction=stepper.FORWARD)
-        time.sleep(DELAY)
+        stepper_motor.onestep(direction=direction)
+        next_step = time.ticks_add(next_step, DELAY)
+        wait = time.ticks_diff(next_step, time.ticks_us())
+        if wait > 0:
+            time.sleep_us(wait)
     stepper_motor.release()
 
 
+def stepper_fwd():
+    print("stepper forward")
+    stepper_move(stepper.FORWARD)
+
+
 def stepper_back():
     print("stepper backward")
-    for _ in range(STEPS):
-        stepper_motor.onestep(direction=stepper.BACKWARD)
-        time.sleep(DELAY)
-    stepper_motor.release()
+    stepper_move(stepper.BACKWARD)
 
 
 def run_test(testnum):
@@ -0,0 +1,12 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 Jose D. Montoya
+#
+# SPDX-License-Identifier: MIT
+"""
+Freeze the library into a custom MicroPython firmware, by including this
+file from the board manifest:
+
+    include("path/to/MicroPython_MOTOR/manifest.py")
+"""
+
+# pylint: disable=undefined-variable
+package("micropython_motor", opt=3)
@@ -39,11 +39,14 @@ class MOTOR:
     :param negative_pwm: The motor input that causes the motor to spin backwards
       when high and the other is low."""
 
+    __slots__ = ("_positive", "_negative", "_throttle", "_decay_mode", "_drive")
+
     def __init__(self, positive_pwm, negative_pwm) -> None:
         self._positive = positive_pwm
         self._negative = negative_pwm
         self._throttle = None
         self._decay_mode = FAST_DECAY
+        self._drive = self._drive_fast
 
     @property
     def throttle(self):
@@ -55,7 +58,7 @@ class MOTOR:
 
     @throttle.setter
     def throttle(self, value) -> None:
-        if value is not None and (value > 1.0 or value < -1.0):
+        if value is not None and abs(value) > 1.0:
             raise ValueError("Throttle must be None or between -1.0 and +1.0")
         self._throttle = value
         if value is None:  # Turn off motor controller (high-Z)
@@ -65,21 +68,28 @@ class MOTOR:
             self._positive.duty_u16(0xFFFF)
             self._negative.duty_u16(0xFFFF)
         else:
-            duty_cycle = int(0xFFFF * abs(value))
-            if self._decay_mode == SLOW_DECAY:  # Slow Decay (Braking) Mode
-                if value < 0:
-                    self._positive.duty_u16(0xFFFF - duty_cycle)
-                    self._negative.duty_u16(0xFFFF)
-                else:
-                    self._positive.duty_u16(0xFFFF)
-                    self._negative.duty_u16(0xFFFF - duty_cycle)
-            else:  # Default Fast Decay (Coasting) Mode
-                if value < 0:
-                    self._positive.duty_u16(0)
-                    self._negative.duty_u16(duty_cycle)
-                else:
-                    self._positive.duty_u16(duty_cycle)
-                    self._negative.duty_u16(0)
+            self._drive(value)
+
+    def _drive_fast(self, value) -> None:
+        # Default Fast Decay (Coasting) Mode
+        # Signed duty cycle, the sign gives the direction
+        duty_cycle = int(0xFFFF * value)
+        if duty_cycle < 0:
+            positive, negative = 0, -duty_cycle
+        else:
+            positive, negative = duty_cycle, 0
+        self._positive.duty_u16(positive)
+        self._negative.duty_u16(negative)
+
+    def _drive_slow(self, value) -> None:
+        # Slow Decay (Braking) Mode
+        duty_cycle = int(0xFFFF * value)
+        if duty_cycle < 0:
+            positive, negative = 0xFFFF + duty_cycle, 0xFFFF
+        else:
+            positive, negative = 0xFFFF, 0xFFFF - duty_cycle
+        self._positive.duty_u16(positive)
+        self._negative.duty_u16(negative)
 
     @property
     def decay_mode(self) -> int:
@@ -92,6 +102,8 @@ class MOTOR:
     def decay_mode(self, mode: int = FAST_DECAY) -> None:
         if mode in (FAST_DECAY, SLOW_DECAY):
             self._decay_mode = mode
+            # Throttle writes go straight to the driver for this mode
+            self._drive = self._drive_slow if mode == SLOW_DECAY else self._drive_fast
         else:
             raise ValueError(
                 "Decay mode value must be either motor.FAST_DECAY or motor.SLOW_DECAY"
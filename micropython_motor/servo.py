@@ -20,19 +20,27 @@ class _BaseServo:
 
     :param pwm_out: PWM output object.
     :param int min_pulse: The minimum pulse length of the servo in microseconds.
-    :param int max_pulse: The maximum pulse length of the servo in microseconds."""
+    :param int max_pulse: The maximum pulse length of the servo in microseconds.
+
+    The PWM frequency of ``pwm_out`` is read once here, so it must be set before
+    creating the servo."""
+
+    # Subclasses adding attributes need their own __slots__
+    __slots__ = ("_pwm_out", "_set_duty", "_freq_scale", "_min_duty", "_duty_range")
 
     def __init__(self, pwm_out, *, min_pulse: int = 500, max_pulse: int = 2250) -> None:
         self._pwm_out = pwm_out
+        self._set_duty = pwm_out.duty_u16
+        # Duty cycle units per microsecond of pulse width
+        self._freq_scale = pwm_out.freq() / 1000000 * 0xFFFF
         self.set_pulse_width_range(min_pulse, max_pulse)
 
     def set_pulse_width_range(
         self, min_pulse: int = 750, max_pulse: int = 2250
     ) -> None:
         """Change min and max pulse widths."""
-        self._min_duty = int((min_pulse * self._pwm_out.freq()) / 1000000 * 0xFFFF)
-        max_duty = (max_pulse * self._pwm_out.freq()) / 1000000 * 0xFFFF
-        self._duty_range = int(max_duty - self._min_duty)
+        self._min_duty = int(min_pulse * self._freq_scale)
+        self._duty_range = int(max_pulse * self._freq_scale) - self._min_duty
 
     @property
     def fraction(self):
@@ -47,12 +55,11 @@ class _BaseServo:
     @fraction.setter
     def fraction(self, value) -> None:
         if value is None:
-            self._pwm_out.duty_u16(0)
+            self._set_duty(0)
             return
         if not 0.0 <= value <= 1.0:
             raise ValueError("Must be 0.0 to 1.0")
-        duty_cycle = self._min_duty + int(value * self._duty_range)
-        self._pwm_out.duty_u16(duty_cycle)
+        self._set_duty(self._min_duty + int(value * self._duty_range))
 
 
 class Servo(_BaseServo):
@@ -85,6 +92,8 @@ class Servo(_BaseServo):
          Test carefully to find the safe minimum and maximum.
     """
 
+    __slots__ = ("actuation_range", "_pwm")
+
     def __init__(
         self,
         pwm_out,
@@ -14,6 +14,10 @@ MicroPython Helper for controlling stepper motors with microstepping support.
 """
 
 import math
+import struct
+import time
+from array import array
+import micropython
 from micropython import const
 
 
@@ -34,6 +38,92 @@ _DOUBLE_STEPS = bytes([0b1010, 0b0110, 0b0101, 0b1001])
 _INTERLEAVE_STEPS = bytes(
     [0b1010, 0b0010, 0b0110, 0b0100, 0b0101, 0b0001, 0b1001, 0b1000]
 )
+# Digital IO coil activation sequences indexed by step style
+_STEP_PATTERNS = (None, _SINGLE_STEPS, _DOUBLE_STEPS, _INTERLEAVE_STEPS)
+# Per coil output levels for each 4 bit coil activation value
+_DIGITAL_FANOUT = tuple(
+    (steps & 1, (steps >> 1) & 1, (steps >> 2) & 1, (steps >> 3) & 1)
+    for steps in range(16)
+)
+
+# Quarter sine microstepping curve for the default of 16 microsteps
+_CURVE_16 = array(
+    "H",
+    (
+        0,
+        6424,
+        12785,
+        19024,
+        25079,
+        30893,
+        36409,
+        41575,
+        46340,
+        50659,
+        54490,
+        57797,
+        60546,
+        62713,
+        64276,
+        65219,
+        65535,
+    ),
+)
+
+
+def _microstep_curve(microsteps):
+    # Only used to build the phase tables, which are cached, so other sizes
+    # are not kept around
+    if microsteps == 16:
+        return _CURVE_16
+    return array(
+        "H",
+        (
+            int(round(0xFFFF * math.sin(math.pi / (2 * microsteps) * i)))
+            for i in range(microsteps + 1)
+        ),
+    )
+
+
+def _phase_table(curve, microsteps, full_torque):
+    # Coil duty cycles for every phase of the electrical cycle, packed as four
+    # uint16 values per phase in coil order.
+    table = bytearray(8 * 4 * microsteps)
+    duty_cycles = array("H", (0, 0, 0, 0))
+    half_step = microsteps >> 1
+    for phase in range(4 * microsteps):
+        trailing_coil = (phase // microsteps) % 4
+        leading_coil = (trailing_coil + 1) % 4
+        microstep = phase % microsteps
+        duty_cycles[0] = duty_cycles[1] = duty_cycles[2] = duty_cycles[3] = 0
+        duty_cycles[leading_coil] = curve[microstep]
+        duty_cycles[trailing_coil] = curve[microsteps - microstep]
+
+        # This ensures DOUBLE steps use full torque. Without it, we'd use
+        #  partial torque from the microstepping curve (0xb504). Both coils only
+        #  get the same duty cycle halfway between full steps.
+        if full_torque and microstep == half_step:
+            duty_cycles[leading_coil] = 0xFFFF
+            duty_cycles[trailing_coil] = 0xFFFF
+
+        struct.pack_into("<HHHH", table, 8 * phase, *duty_cycles)
+    return table
+
+
+# Packed phase tables are read only, so instances with the same microsteps share them
+_PHASE_TABLE_CACHE = {}
+
+
+def _phase_tables(microsteps):
+    tables = _PHASE_TABLE_CACHE.get(microsteps)
+    if tables is None:
+        curve = _microstep_curve(microsteps)
+        tables = (
+            _phase_table(curve, microsteps, True),
+            _phase_table(curve, microsteps, False),
+        )
+        _PHASE_TABLE_CACHE[microsteps] = tables
+    return tables
 
 
 class StepperMotor:
@@ -50,15 +140,38 @@ class StepperMotor:
       the second coil (unipolar) or second input to second coil (bipolar).
     :param bin2: `machine.PWM` or `machine.Pin`-compatible output connected to the driver for
       the fourth coil (unipolar) or second input to second coil (bipolar).
-    :param int microsteps: Number of microsteps between full steps. Must be at least 2 and even.
+    :param int microsteps: Number of microsteps between full steps. Must be at least 2 and a
+      power of two.
 
     """
 
+    __slots__ = (
+        "_coil",
+        "_setters",
+        "_steps",
+        "_steps_mask",
+        "_microsteps",
+        "_is_pwm",
+        "_ms_mask",
+        "_phase_mask",
+        "_phase_table",
+        "_phase_table_mstep",
+        "_current_microstep",
+        "_update_coils",
+        "_timer",
+        "_remaining",
+        "_step_size",
+        "_microstepping",
+    )
+
     def __init__(self, ain1, ain2, bin1, bin2, *, microsteps=16) -> None:
         if microsteps is None:
             # Digital IO Pins
             self._steps = None
+            self._steps_mask = 0
             self._coil = (ain1, ain2, bin1, bin2)
+            # Long enough for every step pattern
+            self._phase_mask = 0b111
         else:
             # PWM Pins set a safe pwm freq for each output
             self._coil = (ain2, bin1, ain1, bin2)
@@ -73,56 +186,73 @@ class StepperMotor:
                         ) from err
             if microsteps < 2:
                 raise ValueError("Microsteps must be at least 2")
-            if microsteps % 2 == 1:
-                raise ValueError("Microsteps must be even")
-            self._curve = [
-                int(round(0xFFFF * math.sin(math.pi / (2 * microsteps) * i)))
-                for i in range(microsteps + 1)
-            ]
+            if microsteps & (microsteps - 1):
+                raise ValueError("Microsteps must be a power of two")
+            self._ms_mask = microsteps - 1
+            self._phase_table, self._phase_table_mstep = _phase_tables(microsteps)
+            self._phase_mask = 4 * microsteps - 1
+        # Bound output methods, so coil updates skip the per call attribute lookup
+        self._setters = tuple(
+            coil.value if microsteps is None else coil.duty_u16 for coil in self._coil
+        )
         self._current_microstep = 0
         self._microsteps = microsteps
+        self._is_pwm = microsteps is not None
+        self._timer = None
+        self._remaining = 0
+        self._step_size = 0
+        self._microstepping = False
+        # The coil update for the pin type is picked once instead of on every step
+        if self._is_pwm:
+            self._update_coils = self._update_coils_pwm
+        else:
+            self._update_coils = self._update_coils_digital
         self._update_coils()
 
-    def _update_coils(self, *, microstepping: bool = False) -> None:
-        if self._microsteps is None:
-            # Digital IO Pins Get coil activation sequence
-            if self._steps is None:
-                steps = 0b0000
-            else:
-                steps = self._steps[self._current_microstep % len(self._steps)]
-            # Energize coils as appropriate:
-            for i, coil in enumerate(self._coil):
-                coil.value((steps >> i) & 0x01)
+    @micropython.native
+    def _update_coils_digital(self, *, microstepping: bool = False) -> None:
+        # pylint: disable=unused-argument
+        # Digital IO Pins Get coil activation sequence
+        if self._steps is None:
+            steps = 0b0000
         else:
-            # PWM Pins
-            duty_cycles = [0, 0, 0, 0]
-            trailing_coil = (self._current_microstep // self._microsteps) % 4
-            leading_coil = (trailing_coil + 1) % 4
-            microstep = self._current_microstep % self._microsteps
-            duty_cycles[leading_coil] = self._curve[microstep]
-            duty_cycles[trailing_coil] = self._curve[self._microsteps - microstep]
-
-            # This ensures DOUBLE steps use full torque. Without it, we'd use
-            #  partial torque from the microstepping curve (0xb504).
-            if not microstepping and (
-                duty_cycles[leading_coil] == duty_cycles[trailing_coil]
-                and duty_cycles[leading_coil] > 0
-            ):
-                duty_cycles[leading_coil] = 0xFFFF
-                duty_cycles[trailing_coil] = 0xFFFF
-
-            # Energize coils as appropriate:
-            for i in range(4):
-                self._coil[i].duty_u16(duty_cycles[i])
+            steps = self._steps[self._current_microstep & self._steps_mask]
+        # Energize coils as appropriate:
+        levels = _DIGITAL_FANOUT[steps]
+        setters = self._setters
+        setters[0](levels[0])
+        setters[1](levels[1])
+        setters[2](levels[2])
+        setters[3](levels[3])
+
+    @micropython.native
+    def _update_coils_pwm(self, *, microstepping: bool = False) -> None:
+        # PWM Pins
+        self._write_phase(
+            self._phase_table_mstep if microstepping else self._phase_table,
+            self._current_microstep,
+        )
 
+    @micropython.viper
+    def _write_phase(self, table, phase: int):
+        duty = ptr16(table)  # pylint: disable=undefined-variable
+        i = phase << 2
+        # Energize coils as appropriate:
+        setters = self._setters
+        setters[0](duty[i])
+        setters[1](duty[i + 1])
+        setters[2](duty[i + 2])
+        setters[3](duty[i + 3])
+
+    @micropython.native
     def release(self) -> None:
         """Releases all the coils so the motor can free spin, also won't use any power"""
         # De-energize coils:
-        for coil in self._coil:
-            if self._microsteps is None:
-                coil.value(0)
-            else:
-                coil.duty_u16(0)
+        setters = self._setters
+        setters[0](0)
+        setters[1](0)
+        setters[2](0)
+        setters[3](0)
 
     def onestep(self, *, direction: int = FORWARD, style: int = SINGLE) -> None:
         """Performs one step of a particular style. The actual rotation amount will vary by style.
@@ -138,28 +268,25 @@ class StepperMotor:
         :param int style: ``SINGLE``, ``DOUBLE``, ``INTERLEAVE``
 
         """
-        if self._microsteps is None:
+        if not self._is_pwm:
             # Digital IO Pins
             step_size = 1
-            if style == SINGLE:
-                self._steps = _SINGLE_STEPS
-            elif style == DOUBLE:
-                self._steps = _DOUBLE_STEPS
-            elif style == INTERLEAVE:
-                self._steps = _INTERLEAVE_STEPS
-            else:
+            if not SINGLE <= style <= INTERLEAVE:
                 raise ValueError("Unsupported step style.")
+            self._steps = _STEP_PATTERNS[style]
+            # Every pattern length is a power of two
+            self._steps_mask = len(self._steps) - 1
         else:
             # PWM Pins Adjust current steps based on the direction and type of step.
             step_size = 0
             if style == MICROSTEP:
                 step_size = 1
             else:
-                half_step = self._microsteps // 2
+                half_step = self._microsteps >> 1
                 full_step = self._microsteps
                 # Its possible the previous steps were MICROSTEPS so first align
                 #  with the interleave pattern.
-                additional_microsteps = self._current_microstep % half_step
+                additional_microsteps = self._current_microstep & (self._ms_mask >> 1)
                 if additional_microsteps != 0:
                     # We set _current_microstep directly because our step size varies
                     # depending on the direction.
@@ -171,9 +298,10 @@ class StepperMotor:
                 elif style == INTERLEAVE:
                     step_size = half_step
 
-                current_interleave = self._current_microstep // half_step
-                if (style == SINGLE and current_interleave % 2 == 1) or (
-                    style == DOUBLE and current_interleave % 2 == 0
+                # Set on odd interleave positions, half_step is a power of two
+                odd_interleave = self._current_microstep & half_step
+                if (style == SINGLE and odd_interleave) or (
+                    style == DOUBLE and not odd_interleave
                 ):
                     step_size = half_step
                 elif style in (SINGLE, DOUBLE):
@@ -183,8 +311,127 @@ class StepperMotor:
             self._current_microstep += step_size
         else:
             self._current_microstep -= step_size
+        # Stay within one electrical cycle so the counter never grows unbounded
+        self._current_microstep &= self._phase_mask
 
         # Now that we know our target microstep we can determine how to energize the four coils.
         self._update_coils(microstepping=style == MICROSTEP)
 
         return self._current_microstep
+
+    @micropython.native
+    def step_many(
+        self,
+        count: int,
+        *,
+        direction: int = FORWARD,
+        style: int = SINGLE,
+        delay_us: int = 6000,
+    ) -> int:
+        """Performs ``count`` steps of a particular style, waiting ``delay_us`` microseconds
+        after each one. Moves the motor exactly like calling `onestep` ``count`` times,
+        but the step size is only worked out once for the whole batch. Raises
+        ``ValueError`` for an unsupported style before stepping.
+
+        :param int count: Number of steps to perform
+        :param int direction: Either ``FORWARD`` or ``BACKWARD``
+        :param int style: ``SINGLE``, ``DOUBLE``, ``INTERLEAVE`` or ``MICROSTEP``
+        :param int delay_us: Time to wait after each step, in microseconds
+
+        """
+        # pylint: disable=no-member
+        step_size = self._aligned_step_size(direction, style)
+        if count < 1:
+            return self._current_microstep
+        # The first step aligns with the desired style's pattern, every step
+        # after it has the same size.
+        self.onestep(direction=direction, style=style)
+        time.sleep_us(delay_us)
+        microstepping = style == MICROSTEP
+        mask = self._phase_mask
+        for _ in range(count - 1):
+            self._current_microstep = (self._current_microstep + step_size) & mask
+            self._update_coils(microstepping=microstepping)
+            time.sleep_us(delay_us)
+        return self._current_microstep
+
+    def _aligned_step_size(self, direction: int, style: int) -> int:
+        # Signed step size of a style once the position is aligned with its pattern
+        if not SINGLE <= style <= MICROSTEP:
+            raise ValueError("Unsupported step style.")
+        if not self._is_pwm or style == MICROSTEP:
+            step_size = 1
+        elif style == INTERLEAVE:
+            step_size = self._microsteps >> 1
+        else:
+            step_size = self._microsteps
+        return step_size if direction == FORWARD else -step_size
+
+    def start(
+        self,
+        steps: int,
+        *,
+        direction: int = FORWARD,
+        style: int = SINGLE,
+        hz: int = 166,
+        timer_id: int = -1,
+    ) -> None:
+        """Performs ``steps`` steps of a particular style in the background, driven by a
+        `machine.Timer` at ``hz`` steps per second, and returns immediately.
+        The coils are released one period after the last step. Any movement started
+        before is stopped first.
+
+        :param int steps: Number of steps to perform
+        :param int direction: Either ``FORWARD`` or ``BACKWARD``
+        :param int style: ``SINGLE``, ``DOUBLE``, ``INTERLEAVE`` or ``MICROSTEP``
+        :param int hz: Step rate in steps per second
+        :param int timer_id: Id of the `machine.Timer` to use. Defaults to ``-1``,
+          a virtual timer, which is not available on every port (the ESP32 only has
+          hardware timers, use ``0`` to ``3`` there)
+
+        """
+        # Only needed for background stepping, so importing the package does not
+        # depend on machine.Timer
+        from machine import Timer  # pylint: disable=import-outside-toplevel
+
+        step_size = self._aligned_step_size(direction, style)
+        self.stop()
+        if steps < 1:
+            return
+        # Align with the style's pattern right away, so the timer callback only
+        # has to advance by a fixed step size.
+        self.onestep(direction=direction, style=style)
+        self._remaining = steps - 1
+        self._step_size = step_size
+        self._microstepping = style == MICROSTEP
+        self._timer = Timer(timer_id)
+        self._timer.init(freq=hz, mode=Timer.PERIODIC, callback=self._timer_step)
+
+    def stop(self) -> None:
+        """Stops a movement started with `start` and releases the coils"""
+        # A tick already scheduled before deinit must not step again
+        self._remaining = 0
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+            self.release()
+
+    @property
+    def running(self) -> bool:
+        """``True`` while a movement started with `start` is in progress"""
+        return self._timer is not None
+
+    @micropython.native
+    def _timer_step(self, timer) -> None:
+        # Scheduled timer callback, a tick queued by a timer that was already
+        # stopped may still run, even after a new start()
+        if timer is not self._timer:
+            return
+        if self._remaining < 1:
+            self.stop()
+            return
+        self._current_microstep = (
+            self._current_microstep + self._step_size
+        ) & self._phase_mask
+        self._update_coils(microstepping=self._microstepping)
+        self._remaining -= 1